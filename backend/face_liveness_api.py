@@ -1,31 +1,217 @@
 import boto3
-from flask import Flask, jsonify, request
+import logging
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from flask import Flask, Response, abort, request
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
+import orjson
 import os
-import base64
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import pybase64 as base64  # SIMD-accelerated, drop-in replacement for base64
+except ImportError:
+    import base64
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that parses request bodies with orjson"""
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for React frontend
 
-# Initialize AWS Rekognition client
-session = boto3.Session(profile_name='default') 
-client = session.client('rekognition')
+# Compress JSON responses; base64 image payloads shrink noticeably with gzip/brotli
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_MIN_SIZE'] = 1024
+Compress(app)
+
+def ojsonify(obj, status=200):
+    """Serialize obj to a JSON response with orjson (fast path for large base64 strings)"""
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
+# Debug output is off by default; set LOG_LEVEL=DEBUG to trace requests. Handlers are
+# configured by the entry points (__main__ / wsgi.py), not on import.
+log = logging.getLogger(__name__)
+log.setLevel(os.environ.get('LOG_LEVEL', 'WARNING').upper())
+
+# Keep boto3/botocore quiet so per-call debug logging doesn't run in request handlers
+logging.getLogger('botocore').setLevel(logging.WARNING)
+
+# Shared AWS client configuration: a larger keep-alive connection pool so concurrent
+# requests reuse warm HTTPS connections instead of queueing on the default pool of 10
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 3},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=10
+)
+
+# Initialize AWS Rekognition client lazily and reuse it for the life of the process
+session = boto3.Session(profile_name='default')
+_client = None
+_client_lock = threading.Lock()
+
+def _get_client():
+    """Return the shared Rekognition client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = session.client('rekognition', config=AWS_CLIENT_CONFIG)
+    return _client
+
+WARMUP_COLLECTION_ID = 'face-liveness-api-warmup'
+
+def prewarm_client():
+    """Open a pooled HTTPS connection to Rekognition before the first real request
+
+    Lists faces in a collection that does not exist, which forces DNS, TLS and
+    SigV4 signing without side effects; the expected ResourceNotFound error is ignored.
+    """
+    try:
+        _get_client().list_faces(CollectionId=WARMUP_COLLECTION_ID, MaxResults=1)
+    except ClientError:
+        pass
+    except Exception as e:
+        log.warning('Rekognition client warm-up failed: %s', e)
+        return
+    log.debug('Rekognition client warmed up')
+
+def start_prewarm():
+    """Warm up the Rekognition client in a background thread unless PREWARM_AWS_CLIENT=0
+
+    Called from serving processes only (the Gunicorn post_fork hook and the dev
+    server child), so importing this module has no network side effects and
+    pooled connections are never shared across forks.
+    """
+    if os.environ.get('PREWARM_AWS_CLIENT', '1') != '0':
+        threading.Thread(target=prewarm_client, name='rekognition-warmup', daemon=True).start()
+
+# S3 client used to presign audit images stored by Rekognition. Presigned URLs must
+# use SigV4 on the bucket's virtual-hosted regional endpoint; SigV2 URLs are rejected
+# by newer buckets and KMS-encrypted objects.
+S3_PRESIGNED_URL_EXPIRY = 300  # seconds
+S3_CLIENT_CONFIG = AWS_CLIENT_CONFIG.merge(Config(
+    signature_version='s3v4',
+    s3={'addressing_style': 'virtual'}
+))
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+def _get_s3_client():
+    """Return the shared S3 client, creating it on first use"""
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                # Rekognition only writes liveness images to buckets in its own region
+                _s3_client = session.client(
+                    's3',
+                    region_name=_get_client().meta.region_name,
+                    config=S3_CLIENT_CONFIG
+                )
+    return _s3_client
+
+def presign_s3_object(s3_object):
+    """Generate a presigned GET URL for an S3Object returned by Rekognition"""
+    params = {'Bucket': s3_object.get("Bucket"), 'Key': s3_object.get("Name")}
+    if s3_object.get("Version"):
+        params['VersionId'] = s3_object.get("Version")
+    return _get_s3_client().generate_presigned_url(
+        'get_object',
+        Params=params,
+        ExpiresIn=S3_PRESIGNED_URL_EXPIRY
+    )
 
 def create_session():
     """Create a new Face Liveness session"""
     try:
-        response = client.create_face_liveness_session()
+        response = _get_client().create_face_liveness_session()
         session_id = response.get("SessionId")
-        print('SessionId: ' + session_id)
+        log.debug('SessionId: %s', session_id)
         return session_id
     except Exception as e:
-        print(f"Error creating session: {e}")
+        log.error('Error creating session: %s', e)
         raise
 
+STATUS_SUCCEEDED = "SUCCEEDED"
+LIVENESS_THRESHOLD = 80.0  # Minimum confidence to treat a session as live; adjust as needed
+
+def format_liveness_image(image, presign=True):
+    """Build the response entry for a Rekognition reference or audit image
+
+    With presign enabled, images stored in S3 are returned as a presigned URL
+    instead of base64 Bytes. The reference image disables it because the face
+    comparison flow needs its Bytes.
+    """
+    s3_object = image.get("S3Object")
+    if presign and s3_object:
+        # Presigned URL lets the client fetch the image directly from S3
+        return {
+            "BoundingBox": image.get("BoundingBox", {}),
+            "Bytes": None,
+            "S3Object": s3_object,
+            "Url": presign_s3_object(s3_object)
+        }
+    image_bytes = image.get("Bytes")
+    return {
+        "BoundingBox": image.get("BoundingBox", {}),
+        "Bytes": base64.b64encode(image_bytes).decode('ascii') if image_bytes else None,  # Base64-encoded image
+        "S3Object": s3_object
+    }
+
+# Completed session results are immutable, so cache them to serve repeated polls
+# without another Rekognition round trip. Entries expire with the presigned URLs
+# they may contain.
+RESULTS_CACHE_MAX_ENTRIES = 256
+RESULTS_CACHE_TTL = S3_PRESIGNED_URL_EXPIRY - 30  # seconds
+_results_cache = OrderedDict()
+_results_cache_lock = threading.Lock()
+
+def _get_cached_results(session_id):
+    """Return cached results for a session, or None if missing or expired"""
+    with _results_cache_lock:
+        entry = _results_cache.get(session_id)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if expires_at <= time.monotonic():
+            del _results_cache[session_id]
+            return None
+        return results
+
+def _cache_results(session_id, results):
+    """Store completed session results, evicting the oldest entry when full"""
+    with _results_cache_lock:
+        _results_cache[session_id] = (time.monotonic() + RESULTS_CACHE_TTL, results)
+        _results_cache.move_to_end(session_id)
+        while len(_results_cache) > RESULTS_CACHE_MAX_ENTRIES:
+            _results_cache.popitem(last=False)
+
+def invalidate_cached_results(session_id):
+    """Drop cached results for a session, returning True if an entry was removed"""
+    with _results_cache_lock:
+        return _results_cache.pop(session_id, None) is not None
+
 def get_session_results(session_id):
     """Get the results of a Face Liveness session with complete face detection data"""
+    cached_results = _get_cached_results(session_id)
+    if cached_results is not None:
+        return cached_results
+    
     try:
-        response = client.get_face_liveness_session_results(SessionId=session_id)
+        response = _get_client().get_face_liveness_session_results(SessionId=session_id)
         
         confidence = response.get("Confidence")
         status = response.get("Status")
@@ -33,10 +219,10 @@ def get_session_results(session_id):
         
         # Handle case where confidence might be None (session not completed)
         if confidence is not None:
-            print('Confidence: ' + "{:.2f}".format(confidence) + "%")
+            log.debug('Confidence: %.2f%%', confidence)
         else:
-            print('Confidence: Not available (session may not be completed)')
-        print('Status: ' + str(status))
+            log.debug('Confidence: Not available (session may not be completed)')
+        log.debug('Status: %s', status)
         
         # Extract face detection data
         reference_image = response.get("ReferenceImage")
@@ -46,33 +232,12 @@ def get_session_results(session_id):
         # Process reference image
         reference_image_data = None
         if reference_image:
-            reference_image_data = {
-                "BoundingBox": reference_image.get("BoundingBox", {}),
-                "Bytes": reference_image.get("Bytes"),  # Base64-encoded image
-                "S3Object": reference_image.get("S3Object")
-            }
-            # Convert bytes to base64 string if present
-            if reference_image_data["Bytes"]:
-                import base64
-                reference_image_data["Bytes"] = base64.b64encode(reference_image_data["Bytes"]).decode('utf-8')
-            
-            print(f"Reference image available with bounding box: {reference_image_data['BoundingBox']}")
+            reference_image_data = format_liveness_image(reference_image, presign=False)
+            log.debug('Reference image available with bounding box: %s', reference_image_data['BoundingBox'])
         
         # Process audit images
-        audit_images_data = []
-        for i, audit_image in enumerate(audit_images):
-            audit_data = {
-                "BoundingBox": audit_image.get("BoundingBox", {}),
-                "Bytes": audit_image.get("Bytes"),
-                "S3Object": audit_image.get("S3Object")
-            }
-            # Convert bytes to base64 string if present
-            if audit_data["Bytes"]:
-                import base64
-                audit_data["Bytes"] = base64.b64encode(audit_data["Bytes"]).decode('utf-8')
-            
-            audit_images_data.append(audit_data)
-            print(f"Audit image {i+1} available with bounding box: {audit_data['BoundingBox']}")
+        audit_images_data = [format_liveness_image(audit_image) for audit_image in audit_images]
+        log.debug('Processed %d audit images', len(audit_images_data))
         
         # Process challenge information
         challenge_data = None
@@ -81,14 +246,13 @@ def get_session_results(session_id):
                 "Type": challenge.get("Type"),
                 "Version": challenge.get("Version")
             }
-            print(f"Challenge: {challenge_data}")
+            log.debug('Challenge: %s', challenge_data)
         
-        is_live = status == "SUCCEEDED" and confidence is not None and confidence > 80  # Adjust threshold as needed
+        is_live = confidence is not None and confidence > LIVENESS_THRESHOLD and status == STATUS_SUCCEEDED
         
-        print(f"Total audit images: {len(audit_images_data)}")
-        print(f"Reference image available: {reference_image_data is not None}")
+        log.debug('Reference image available: %s', reference_image_data is not None)
         
-        return {
+        results = {
             "sessionId": session_id_response,
             "status": status,
             "confidence": confidence,
@@ -97,21 +261,32 @@ def get_session_results(session_id):
             "auditImages": audit_images_data,
             "challenge": challenge_data
         }
+        if status == STATUS_SUCCEEDED:
+            _cache_results(session_id, results)
+        return results
     except Exception as e:
-        print(f"Error getting session results: {e}")
+        log.error('Error getting session results: %s', e)
         raise
 
 def compare_faces(source_image_base64, target_image_base64, similarity_threshold=80):
-    """Compare two faces using AWS Rekognition CompareFaces API"""
+    """Compare two base64-encoded faces using AWS Rekognition CompareFaces API"""
+    # Convert base64 strings to bytes (skip strict validation to stay on the SIMD path)
     try:
-        # Convert base64 strings to bytes
-        source_image_bytes = base64.b64decode(source_image_base64)
-        target_image_bytes = base64.b64decode(target_image_base64)
-        
-        print(f"Comparing faces with similarity threshold: {similarity_threshold}%")
+        source_image_bytes = base64.b64decode(source_image_base64, validate=False)
+        target_image_bytes = base64.b64decode(target_image_base64, validate=False)
+    except Exception as e:
+        log.error('Error decoding images: %s', e)
+        raise
+    
+    return compare_face_bytes(source_image_bytes, target_image_bytes, similarity_threshold)
+
+def compare_face_bytes(source_image_bytes, target_image_bytes, similarity_threshold=80):
+    """Compare two raw image payloads using AWS Rekognition CompareFaces API"""
+    try:
+        log.debug('Comparing faces with similarity threshold: %s%%', similarity_threshold)
         
         # Call AWS Rekognition CompareFaces
-        response = client.compare_faces(
+        response = _get_client().compare_faces(
             SimilarityThreshold=similarity_threshold,
             SourceImage={'Bytes': source_image_bytes},
             TargetImage={'Bytes': target_image_bytes}
@@ -122,14 +297,15 @@ def compare_faces(source_image_base64, target_image_base64, similarity_threshold
         unmatched_faces = response.get('UnmatchedFaces', [])
         source_image_face = response.get('SourceImageFace', {})
         
-        print(f"Found {len(face_matches)} face matches")
-        print(f"Found {len(unmatched_faces)} unmatched faces")
+        log.debug('Found %d face matches', len(face_matches))
+        log.debug('Found %d unmatched faces', len(unmatched_faces))
         
-        # Log match details
-        for i, match in enumerate(face_matches):
-            similarity = match.get('Similarity', 0)
-            confidence = match.get('Face', {}).get('Confidence', 0)
-            print(f"Match {i+1}: Similarity={similarity:.2f}%, Confidence={confidence:.2f}%")
+        # Log match details only when debug output is enabled
+        if log.isEnabledFor(logging.DEBUG):
+            for i, match in enumerate(face_matches):
+                similarity = match.get('Similarity', 0)
+                confidence = match.get('Face', {}).get('Confidence', 0)
+                log.debug('Match %d: Similarity=%.2f%% Confidence=%.2f%%', i + 1, similarity, confidence)
         
         return {
             "matches": face_matches,
@@ -139,20 +315,61 @@ def compare_faces(source_image_base64, target_image_base64, similarity_threshold
         }
         
     except Exception as e:
-        print(f"Error comparing faces: {e}")
+        log.error('Error comparing faces: %s', e)
         raise
 
+# Worker pool for overlapping independent CompareFaces calls on the shared client.
+# Only pays off when comparing one source against two or more targets.
+BATCH_COMPARE_MAX_WORKERS = 16
+BATCH_COMPARE_MAX_TARGETS = 16  # Each target is a separately billed CompareFaces call
+_compare_executor = ThreadPoolExecutor(max_workers=BATCH_COMPARE_MAX_WORKERS)
+
+def compare_faces_batch(source_image_base64, target_images_base64, similarity_threshold=80):
+    """Compare one face against several targets with concurrent CompareFaces calls"""
+    source_image_bytes = base64.b64decode(source_image_base64, validate=False)
+    
+    def compare_target(target_image_base64):
+        try:
+            target_image_bytes = base64.b64decode(target_image_base64, validate=False)
+            results = compare_face_bytes(source_image_bytes, target_image_bytes, similarity_threshold)
+            return dict(results, success=True)
+        except Exception as e:
+            return {"error": str(e), "success": False}
+    
+    if len(target_images_base64) < 2:
+        return [compare_target(target) for target in target_images_base64]
+    return list(_compare_executor.map(compare_target, target_images_base64))
+
+_NUM_TYPES = (int, float)
+SIMILARITY_THRESHOLD_ERROR = "similarityThreshold must be a number between 0 and 100"
+
+def _validate_similarity_threshold(similarity_threshold):
+    """Return the threshold if it is an int/float in [0, 100], otherwise raise ValueError"""
+    if type(similarity_threshold) not in _NUM_TYPES or not (0 <= similarity_threshold <= 100):
+        raise ValueError(SIMILARITY_THRESHOLD_ERROR)
+    return similarity_threshold
+
+def _parse_compare_body(data):
+    """Return (sourceImage, targetImage, similarityThreshold) from a compare-faces body, or raise ValueError"""
+    if not data:
+        raise ValueError("No JSON data provided")
+    source_image = data.get('sourceImage')
+    target_image = data.get('targetImage')
+    if not source_image or not target_image:
+        raise ValueError("Both sourceImage and targetImage are required")
+    return source_image, target_image, _validate_similarity_threshold(data.get('similarityThreshold', 80))
+
 @app.route('/api/create-liveness-session', methods=['POST'])
 def create_liveness_session():
     """API endpoint to create a new Face Liveness session"""
     try:
         session_id = create_session()
-        return jsonify({
+        return ojsonify({
             "sessionId": session_id,
             "success": True
         })
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "error": str(e),
             "success": False
         }), 500
@@ -163,7 +380,7 @@ def get_liveness_results():
     try:
         session_id = request.args.get('sessionId')
         if not session_id:
-            return jsonify({
+            return ojsonify({
                 "error": "sessionId parameter is required",
                 "success": False
             }), 400
@@ -171,7 +388,7 @@ def get_liveness_results():
         results = get_session_results(session_id)
         
         # Return complete results including face detection data
-        return jsonify({
+        return ojsonify({
             "success": True,
             "sessionId": results["sessionId"],
             "status": results["status"],
@@ -182,44 +399,152 @@ def get_liveness_results():
             "challenge": results["challenge"]
         })
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "error": str(e),
             "success": False
         }), 500
 
+@app.route('/api/liveness-cache/<session_id>', methods=['DELETE'])
+def delete_liveness_cache(session_id):
+    """API endpoint to drop cached Face Liveness session results
+
+    Only available in testing/debug mode or when ENABLE_LIVENESS_CACHE_ROUTE=1,
+    so public clients cannot evict entries and force fresh Rekognition calls.
+    """
+    if not (app.testing or app.debug or os.environ.get('ENABLE_LIVENESS_CACHE_ROUTE') == '1'):
+        abort(404)
+    removed = invalidate_cached_results(session_id)
+    return ojsonify({
+        "sessionId": session_id,
+        "removed": removed,
+        "success": True
+    })
+
 @app.route('/api/compare-faces', methods=['POST'])
 def compare_faces_api():
     """API endpoint to compare two faces using AWS Rekognition"""
+    try:
+        try:
+            source_image, target_image, similarity_threshold = _parse_compare_body(request.get_json())
+        except ValueError as e:
+            return ojsonify({
+                "error": str(e),
+                "success": False
+            }), 400
+        
+        # Compare faces
+        results = compare_faces(source_image, target_image, similarity_threshold)
+        
+        return ojsonify({
+            "success": True,
+            "matches": results["matches"],
+            "unmatchedFaces": results["unmatchedFaces"],
+            "sourceImageFace": results["sourceImageFace"],
+            "totalMatches": results["totalMatches"],
+            "similarityThreshold": similarity_threshold
+        })
+        
+    except Exception as e:
+        return ojsonify({
+            "error": str(e),
+            "success": False
+        }), 500
+
+@app.route('/api/compare-faces-batch', methods=['POST'])
+def compare_faces_batch_api():
+    """API endpoint to compare one face against several target faces
+
+    Expects JSON with ``sourceImage`` (base64), ``targetImages`` (list of base64)
+    and an optional ``similarityThreshold``. Results are returned in the same
+    order as ``targetImages``; a failed comparison carries its own error.
+    """
     try:
         data = request.get_json()
         
         if not data:
-            return jsonify({
+            return ojsonify({
                 "error": "No JSON data provided",
                 "success": False
             }), 400
         
         source_image = data.get('sourceImage')
-        target_image = data.get('targetImage')
+        target_images = data.get('targetImages')
         similarity_threshold = data.get('similarityThreshold', 80)
         
-        if not source_image or not target_image:
-            return jsonify({
-                "error": "Both sourceImage and targetImage are required",
+        if not source_image or not isinstance(target_images, list) or not target_images:
+            return ojsonify({
+                "error": "sourceImage and a non-empty targetImages list are required",
+                "success": False
+            }), 400
+        
+        if len(target_images) > BATCH_COMPARE_MAX_TARGETS:
+            return ojsonify({
+                "error": f"targetImages may contain at most {BATCH_COMPARE_MAX_TARGETS} images",
+                "success": False
+            }), 400
+        
+        if not all(isinstance(target_image, str) and target_image for target_image in target_images):
+            return ojsonify({
+                "error": "Each entry in targetImages must be a non-empty base64 string",
                 "success": False
             }), 400
         
         # Validate similarity threshold
-        if not isinstance(similarity_threshold, (int, float)) or similarity_threshold < 0 or similarity_threshold > 100:
-            return jsonify({
-                "error": "similarityThreshold must be a number between 0 and 100",
+        try:
+            _validate_similarity_threshold(similarity_threshold)
+        except ValueError as e:
+            return ojsonify({
+                "error": str(e),
                 "success": False
             }), 400
         
         # Compare faces
-        results = compare_faces(source_image, target_image, similarity_threshold)
+        results = compare_faces_batch(source_image, target_images, similarity_threshold)
+        
+        return ojsonify({
+            "success": True,
+            "results": results,
+            "similarityThreshold": similarity_threshold
+        })
+        
+    except Exception as e:
+        return ojsonify({
+            "error": str(e),
+            "success": False
+        }), 500
+
+@app.route('/api/compare-faces-binary', methods=['POST'])
+def compare_faces_binary_api():
+    """API endpoint to compare two faces sent as raw image uploads
+
+    Expects multipart/form-data with two file parts, ``source`` and ``target``,
+    and an optional ``similarityThreshold`` form field (defaults to 80). The
+    image bytes are passed straight to Rekognition, so clients should append
+    the image Blobs to a FormData instead of reading them as base64 data URLs.
+    """
+    try:
+        source_file = request.files.get('source')
+        target_file = request.files.get('target')
+        
+        if not source_file or not target_file:
+            return ojsonify({
+                "error": "Both source and target image files are required",
+                "success": False
+            }), 400
+        
+        # Validate similarity threshold
+        try:
+            similarity_threshold = _validate_similarity_threshold(float(request.form.get('similarityThreshold', 80)))
+        except ValueError:
+            return ojsonify({
+                "error": SIMILARITY_THRESHOLD_ERROR,
+                "success": False
+            }), 400
+        
+        # Compare faces
+        results = compare_face_bytes(source_file.read(), target_file.read(), similarity_threshold)
         
-        return jsonify({
+        return ojsonify({
             "success": True,
             "matches": results["matches"],
             "unmatchedFaces": results["unmatchedFaces"],
@@ -229,7 +554,7 @@ def compare_faces_api():
         })
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "error": str(e),
             "success": False
         }), 500
@@ -237,7 +562,7 @@ def compare_faces_api():
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy"})
+    return ojsonify({"status": "healthy"})
 
 def main():
     """Main function for testing"""
@@ -250,5 +575,13 @@ def main():
     # print('Status of Face Liveness Session: ' + status)
 
 if __name__ == "__main__":
-    # Run the Flask app
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    logging.basicConfig()
+    if os.environ.get("FLASK_ENV") == "dev":
+        # Only warm up in the reloader child that actually serves requests
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            start_prewarm()
+        # Run the Flask development server
+        app.run(debug=True, host='0.0.0.0', port=5000)
+    else:
+        print('Use FLASK_ENV=dev for the development server, or run with Gunicorn: '
+              'gunicorn -w 2 -k gthread --threads 16 -b 0.0.0.0:5000 wsgi:app --timeout 30 --keep-alive 5')
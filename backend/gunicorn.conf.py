@@ -0,0 +1,7 @@
+"""Gunicorn configuration for the Face Liveness API (loaded automatically from this directory)"""
+
+
+def post_fork(server, worker):
+    """Warm up the Rekognition client in each worker after it has been forked"""
+    from face_liveness_api import start_prewarm
+    start_prewarm()
@@ -0,0 +1,14 @@
+"""WSGI entry point for running the Face Liveness API under Gunicorn
+
+Production command:
+    gunicorn -w 2 -k gthread --threads 16 -b 0.0.0.0:5000 wsgi:app --timeout 30 --keep-alive 5
+
+Every handler is I/O-bound on AWS calls, so threads share the warm boto3
+connection pool within each worker. For local development run
+face_liveness_api.py with FLASK_ENV=dev instead.
+"""
+import logging
+
+from face_liveness_api import app
+
+logging.basicConfig()
@@ -21,6 +21,7 @@ interface BoundingBox {
 interface AuditImage {
   BoundingBox: BoundingBox;
   Bytes?: string; // Base64-encoded image
+  Url?: string; // Presigned S3 URL, set when the image is stored in S3
   S3Object?: {
     Bucket: string;
     Name: string;
@@ -429,9 +430,9 @@ export function LivenessQuickStartReact() {
                   <div key={index} style={{ border: '1px solid #ddd', borderRadius: '8px', padding: '10px' }}>
                     <h5>Audit Image {index + 1}</h5>
                     
-                    {auditImage.Bytes && (
-                      <img 
-                        src={`data:image/jpeg;base64,${auditImage.Bytes}`}
+                    {(auditImage.Bytes || auditImage.Url) && (
+                      <img
+                        src={auditImage.Bytes ? `data:image/jpeg;base64,${auditImage.Bytes}` : auditImage.Url}
                         alt={`Audit face ${index + 1}`}
                         style={{ 
                           width: '100%', 